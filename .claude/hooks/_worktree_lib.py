@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the worktree lifecycle hooks.
+
+worktree-auto-create.py and worktree-auto-cleanup.py run as standalone
+scripts, so this module lives beside them and is resolved through the
+script directory on sys.path. Keeping the branch/workspace plumbing in
+one place stops the hooks from drifting apart.
+"""
+import functools
+import json
+import mmap
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+# Resolve binaries once at import so every spawn skips the PATH walk
+GIT_BIN = shutil.which("git") or "git"
+GH_BIN = shutil.which("gh") or "gh"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def json_loads(data):
+        """Parse JSON with orjson when available."""
+        return orjson.loads(data)
+
+    def json_dumps(obj, indent=True):
+        """Serialize JSON with orjson when available."""
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode()
+else:
+    def json_loads(data):
+        """Parse JSON with the stdlib fallback."""
+        return json.loads(data)
+
+    def json_dumps(obj, indent=True):
+        """Serialize JSON with the stdlib fallback."""
+        return json.dumps(obj, indent=2 if indent else None)
+
+# Centralized workspace location shared by both hooks
+WORKSPACE_ROOT = Path(os.path.expanduser("~/.claude/git-workspace"))
+ARCHIVE_ROOT = WORKSPACE_ROOT / ".archive"
+
+# Long-lived branches that never get per-issue worktrees and are never
+# cleaned up by the lifecycle hooks
+PROTECTED_BRANCHES = frozenset({"main", "master", "dev", "develop"})
+
+_pygit2 = False  # False = not probed yet, None = unavailable
+
+
+def git_bindings():
+    """Return the pygit2 module if installed, probing on first use.
+
+    libgit2 answers pure-git queries in-process instead of paying a
+    fork+exec per question. The probe is deferred so early-exit hook
+    paths never import it.
+    """
+    global _pygit2
+    if _pygit2 is False:
+        try:
+            import pygit2
+            _pygit2 = pygit2
+        except ImportError:
+            _pygit2 = None
+    return _pygit2
+
+
+# HEAD parse results keyed by path, invalidated by mtime so switching
+# branches is picked up without re-reading an unchanged file
+_HEAD_CACHE = {}
+
+
+def _branch_from_head_file(repo_dir):
+    """Parse the current branch straight out of .git/HEAD, or None.
+
+    Follows the gitdir pointer when .git is a worktree file and maps
+    the (tiny, page-cache-hot) HEAD file instead of buffered reads.
+    Returns None for detached HEAD or unexpected layouts so callers can
+    fall back to heavier machinery.
+    """
+    git_path = os.path.join(repo_dir, ".git")
+    try:
+        if os.path.isfile(git_path):
+            with open(git_path) as f:
+                pointer = f.read().strip()
+            if not pointer.startswith("gitdir: "):
+                return None
+            git_dir = os.path.join(repo_dir, pointer[len("gitdir: "):])
+        else:
+            git_dir = git_path
+
+        head_path = os.path.join(git_dir, "HEAD")
+        mtime_ns = os.stat(head_path).st_mtime_ns
+        cached = _HEAD_CACHE.get(head_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with open(head_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                branch = None
+                if mm[:16] == b"ref: refs/heads/":
+                    end = mm.find(b"\n")
+                    branch = mm[16:end if end != -1 else mm.size()].decode().strip()
+    except (OSError, ValueError):
+        return None
+
+    _HEAD_CACHE[head_path] = (mtime_ns, branch)
+    return branch
+
+
+@functools.lru_cache(maxsize=1)
+def get_current_branch():
+    """Get current git branch (memoized per hook invocation).
+
+    The common case reads one small .git/HEAD file instead of paying a
+    subprocess or library call; pygit2/git are fallbacks for detached
+    HEAD and unusual repo layouts.
+    """
+    branch = _branch_from_head_file(os.getcwd())
+    if branch is not None:
+        return branch
+
+    pygit2 = git_bindings()
+    if pygit2 is not None:
+        try:
+            repo = pygit2.Repository(os.getcwd())
+            if repo.head_is_unborn or repo.head_is_detached:
+                return None
+            return repo.head.shorthand
+        except pygit2.GitError:
+            return None
+
+    try:
+        result = subprocess.run(
+            [GIT_BIN, "branch", "--show-current"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            check=True,
+            close_fds=False
+        )
+        return result.stdout.decode().strip()
+    except subprocess.CalledProcessError:
+        return None
@@ -5,159 +5,454 @@ Triggers on SubagentStop to clean up completed phase worktrees.
 
 Hook Event: SubagentStop (agent task completion)
 """
-import json
+import functools
 import sys
 import subprocess
 import os
-from datetime import datetime
+import threading
 from pathlib import Path
 
+# shlex, datetime and concurrent.futures are imported lazily below:
+# the common invocation (branch not merged, or no worktrees) exits
+# before needing them, and hook latency is dominated by interpreter
+# startup plus imports.
+
+from _worktree_lib import (
+    ARCHIVE_ROOT,
+    GH_BIN,
+    GIT_BIN,
+    PROTECTED_BRANCHES,
+    WORKSPACE_ROOT,
+    get_current_branch,
+    git_bindings,
+    json_dumps,
+    json_loads,
+)
+
+# Serializes stderr output from concurrent worktree checks
+_print_lock = threading.Lock()
+
+# On-disk cache of SHA-keyed check results, shared across invocations
+_CACHE_DIR = WORKSPACE_ROOT / ".cache"
+
+
+def log_stderr(message):
+    """Print to stderr without interleaving across worker threads."""
+    with _print_lock:
+        print(message, file=sys.stderr)
+
+
+@functools.lru_cache(maxsize=32)
+def is_branch_merged(branch):
+    """Check if branch is merged to main (memoized per hook invocation).
+
+    `git merge-base --is-ancestor` answers via exit code without
+    enumerating every local branch, and avoids the substring false
+    positives of matching against `git branch --merged` output
+    (e.g. feat/foo matching feat/foo-bar). With pygit2 installed the
+    same ancestry walk runs in-process with no subprocess at all.
+    """
+    pygit2 = git_bindings()
+    if pygit2 is not None:
+        try:
+            repo = pygit2.Repository(os.getcwd())
+            branch_ref = repo.branches.get(branch)
+            main_ref = repo.branches.get("main")
+            if branch_ref is not None and main_ref is not None:
+                return (branch_ref.target == main_ref.target
+                        or repo.descendant_of(main_ref.target, branch_ref.target))
+        except pygit2.GitError:
+            pass
+
+    result = subprocess.run(
+        [GIT_BIN, "merge-base", "--is-ancestor", branch, "main"],
+        capture_output=True,
+        check=False,
+        stdin=subprocess.DEVNULL,
+        close_fds=False
+    )
+    return result.returncode == 0
+
+
+def git_state(worktree_path):
+    """Report (has_uncommitted_changes, unpushed_commits) in one git call.
+
+    `git status --porcelain=v2 --branch -z` emits the upstream
+    ahead/behind header and the dirty-state records in a single
+    subprocess, replacing the separate status + log spawns. Output is
+    streamed rather than buffered: headers come first, so the first
+    entry record settles the dirty bit and the child is terminated
+    instead of listing thousands of changed files into memory. With
+    pygit2 installed both answers come from in-process libgit2 calls.
+    """
+    pygit2 = git_bindings()
+    if pygit2 is not None:
+        try:
+            repo = pygit2.Repository(worktree_path)
+            dirty = bool(repo.status())
+            unpushed = 0
+            if not repo.head_is_unborn and not repo.head_is_detached:
+                head_branch = repo.branches.get(repo.head.shorthand)
+                upstream = head_branch.upstream if head_branch else None
+                if upstream is not None:
+                    unpushed, _ = repo.ahead_behind(
+                        repo.head.target, upstream.target
+                    )
+            return dirty, unpushed
+        except pygit2.GitError:
+            return True, 0  # Assume has changes if can't check
 
-def get_current_branch():
-    """Get current git branch."""
+    try:
+        proc = subprocess.Popen(
+            [GIT_BIN, "-C", worktree_path, "status", "--porcelain=v2", "--branch", "-z"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
+        )
+    except OSError:
+        return True, 0  # Assume has changes if can't check
+
+    dirty = False
+    unpushed = 0
+    buf = b""
+    with proc.stdout:
+        while not dirty:
+            chunk = proc.stdout.read(8192)
+            if not chunk:
+                break
+            buf += chunk
+            records = buf.split(b"\0")
+            buf = records.pop()  # keep any partial trailing record
+            for record in records:
+                if record.startswith(b"# branch.ab "):
+                    # Header format: "# branch.ab +<ahead> -<behind>"
+                    unpushed = int(record.split()[2])
+                elif record and not record.startswith(b"# "):
+                    dirty = True
+        if dirty:
+            proc.terminate()
+
+    returncode = proc.wait()
+    if not dirty and returncode != 0:
+        return True, 0  # Assume has changes if can't check
+
+    # No branch.ab header means no upstream - matches the old behavior of
+    # treating a missing origin/<branch> as nothing unpushed
+    return dirty, unpushed
+
+
+@functools.lru_cache(maxsize=16)
+def _pr_info(branch):
+    """Fetch PR number and review decision for a branch in one gh call.
+
+    Memoized per hook invocation so several worktrees on the same
+    branch share a single GitHub round-trip. Returns None (and never
+    blocks cleanup) when gh is missing or the query fails.
+    """
     try:
         result = subprocess.run(
-            ["git", "branch", "--show-current"],
+            [GH_BIN, "pr", "list", "--head", branch,
+             "--json", "number,reviewDecision", "--limit", "1"],
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
         )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
+        prs = json_loads(result.stdout) if result.stdout.strip() else []
+        return prs[0] if prs else None
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
         return None
 
 
-def is_branch_merged(branch):
-    """Check if branch is merged to main."""
+def archive_metadata(worktree_path, reason="agent-completed"):
+    """Archive workspace metadata before cleanup."""
+    # Reuse the dict parsed during the workspace scan when available so
+    # WORKSPACE_META.json is read and parsed at most once per worktree
+    metadata = _meta_cache.get(str(worktree_path))
+    if metadata is None:
+        try:
+            with open(Path(worktree_path) / "WORKSPACE_META.json") as f:
+                metadata = json_loads(f.read())
+        except (FileNotFoundError, ValueError, IOError):
+            return
+
+    from datetime import datetime, timezone
+
+    # Capture the clock once so the archive filename and the archivedAt
+    # field can never straddle a second boundary and disagree
+    now = datetime.now(timezone.utc)
+
+    # Update metadata
+    metadata["status"] = "archived"
+    metadata["archivedAt"] = now.isoformat().replace("+00:00", "Z")
+    metadata["reason"] = reason
+
+    # Backfill PR state if it wasn't known when the workspace was created
+    # (one combined gh query covers number + review decision)
+    if not metadata.get("pullRequest"):
+        pr = _pr_info(metadata.get("branch", ""))
+        if pr:
+            metadata["pullRequest"] = f"#{pr['number']}"
+            metadata["reviewDecision"] = pr.get("reviewDecision")
+
+    # Create archive directory at centralized workspace location
+    ARCHIVE_ROOT.mkdir(parents=True, exist_ok=True)
+
+    # Archive filename using Linear issue ID
+    linear_issue = metadata.get("linearIssue", "unknown")
+    branch = metadata.get("branch", "unknown")
+    timestamp = now.strftime("%Y%m%d-%H%M%S")
+    archive_name = f"{linear_issue.lower()}-{branch.replace('/', '-')}-{timestamp}.json"
+    archive_path = ARCHIVE_ROOT / archive_name
+
+    # Save archived metadata atomically: serialize first, write + fsync
+    # a temp file in the same directory, then rename over the target so
+    # a killed hook can never leave a half-written archive behind
+    payload = json_dumps(metadata).encode()
+    tmp_path = f"{archive_path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, archive_path)
+    except OSError as e:
+        log_stderr(f"❌ Failed to archive metadata: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return
+
+    log_stderr(f"📦 Archived metadata: {archive_path}")
+
+
+def _rev_parse(ref, cwd=None):
+    """Resolve a ref to its commit SHA, or None if it can't be resolved."""
+    cmd = [GIT_BIN]
+    if cwd:
+        cmd += ["-C", cwd]
+    cmd += ["rev-parse", ref]
     try:
         result = subprocess.run(
-            ["git", "branch", "--merged", "main"],
+            cmd,
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
         )
-        return branch in result.stdout
+        return result.stdout.strip()
     except subprocess.CalledProcessError:
-        return False
+        return None
 
 
-def has_uncommitted_changes(worktree_path):
-    """Check if worktree has uncommitted changes."""
+def _cached_check(branch, check, key, compute):
+    """Memoize a boolean check on disk, keyed by commit SHA.
+
+    Results live in one small JSON file per branch under the workspace
+    cache directory and are only trusted while the stored key (the
+    relevant commit SHAs) still matches, so a moved tip invalidates the
+    entry automatically. Writes go through a temp file + os.replace so
+    concurrent hook invocations never read a torn file.
+    """
+    path = _CACHE_DIR / (branch.replace("/", "-") + ".json")
+    cache = {}
     try:
-        result = subprocess.run(
-            ["git", "-C", worktree_path, "status", "--porcelain"],
+        with open(path) as f:
+            cache = json_loads(f.read())
+    except (FileNotFoundError, ValueError, IOError):
+        pass
+
+    entry = cache.get(check)
+    if isinstance(entry, dict) and entry.get("key") == key:
+        return entry["value"]
+
+    value = compute()
+    cache[check] = {"key": key, "value": value}
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json_dumps(cache, indent=False))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Cache is best-effort; the computed value still stands
+    return value
+
+
+def verify_tests_pass(worktree_path, branch):
+    """Run unit tests related to the branch's changes before cleanup.
+
+    The branch is already merged, so this is a final guard rather than
+    CI: only tests related to files changed against main are run, and
+    an empty diff passes immediately. An unavailable or timed-out
+    runner does not block cleanup - CI covered the merge. Results are
+    cached on disk per worktree HEAD SHA so repeated SubagentStop
+    triggers on an unchanged branch skip the runner entirely.
+    """
+    sha = _rev_parse("HEAD", cwd=worktree_path)
+    if sha is None:
+        return _run_related_tests(worktree_path)
+    return _cached_check(
+        branch, "tests_passed", sha, lambda: _run_related_tests(worktree_path)
+    )
+
+
+def _run_related_tests(worktree_path):
+    try:
+        diff = subprocess.run(
+            [GIT_BIN, "-C", worktree_path, "diff", "--name-only", "main...HEAD"],
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
         )
-        return bool(result.stdout.strip())
     except subprocess.CalledProcessError:
-        return True  # Assume has changes if can't check
+        return True
 
+    changed = [f for f in diff.stdout.splitlines() if f.endswith((".ts", ".tsx"))]
+    if not changed:
+        return True
 
-def has_unpushed_commits(worktree_path, branch):
-    """Check if worktree has unpushed commits."""
     try:
         result = subprocess.run(
-            ["git", "-C", worktree_path, "log", f"origin/{branch}..HEAD", "--oneline"],
+            ["npx", "vitest", "related", *changed, "--run"],
+            cwd=worktree_path,
             capture_output=True,
-            text=True,
-            check=False  # Don't fail if no remote
+            timeout=300
         )
-        return bool(result.stdout.strip())
-    except subprocess.CalledProcessError:
-        return False
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return True
+    return result.returncode == 0
 
 
-def archive_metadata(worktree_path, reason="agent-completed"):
-    """Archive workspace metadata before cleanup."""
-    metadata_path = Path(worktree_path) / "WORKSPACE_META.json"
-    if not metadata_path.exists():
-        return
+def check_worktree(worktree_path, branch):
+    """Run safety checks and archive metadata for a single worktree.
 
-    # Read existing metadata
-    with open(metadata_path) as f:
-        metadata = json.load(f)
+    Returns True when the worktree is ready for removal (or already
+    gone); the removal itself is batched in remove_worktrees.
+    """
+    if not os.path.exists(worktree_path):
+        return True  # Already cleaned up
 
-    # Update metadata
-    metadata["status"] = "archived"
-    metadata["archivedAt"] = datetime.utcnow().isoformat() + "Z"
-    metadata["reason"] = reason
+    # Safety checks (one git status call covers dirty + unpushed state)
+    dirty, unpushed = git_state(worktree_path)
+    if dirty:
+        log_stderr(f"⚠️  Skipping cleanup: Uncommitted changes in {worktree_path}")
+        return False
 
-    # Create archive directory at centralized workspace location
-    archive_dir = Path(os.path.expanduser("~/.claude/git-workspace/.archive"))
-    archive_dir.mkdir(parents=True, exist_ok=True)
+    if unpushed:
+        log_stderr(f"⚠️  Skipping cleanup: Unpushed commits in {worktree_path}")
+        return False
 
-    # Archive filename using Linear issue ID
-    linear_issue = metadata.get("linearIssue", "unknown")
-    branch = metadata.get("branch", "unknown")
-    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    archive_name = f"{linear_issue.lower()}-{branch.replace('/', '-')}-{timestamp}.json"
-    archive_path = archive_dir / archive_name
+    if not verify_tests_pass(worktree_path, branch):
+        log_stderr(f"⚠️  Skipping cleanup: Related tests failing in {worktree_path}")
+        return False
 
-    # Save archived metadata
-    with open(archive_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    # Archive metadata
+    archive_metadata(worktree_path, reason="agent-completed")
+    return True
 
-    print(f"📦 Archived metadata: {archive_path}", file=sys.stderr)
 
+def remove_worktrees(paths):
+    """Remove worktrees and prune refs in one child process.
 
-def cleanup_worktree(worktree_path, branch):
-    """Clean up a single worktree safely."""
-    worktree_path = Path(worktree_path)
+    `git worktree remove` only accepts a single path per invocation, so
+    the removals are chained inside one `sh -c` call with the prune
+    fused onto the end - one fork+exec instead of N+1. Returns the
+    number of worktrees actually removed.
+    """
+    if not paths:
+        return 0
 
-    if not worktree_path.exists():
-        return True  # Already cleaned up
+    import shlex
 
-    # Safety checks
-    if has_uncommitted_changes(str(worktree_path)):
-        print(f"⚠️  Skipping cleanup: Uncommitted changes in {worktree_path}", file=sys.stderr)
-        return False
+    script = "; ".join(
+        f"{shlex.quote(GIT_BIN)} worktree remove {shlex.quote(path)}"
+        for path in paths
+    ) + f"; {shlex.quote(GIT_BIN)} worktree prune"
+    subprocess.run(
+        ["sh", "-c", script],
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        close_fds=False
+    )
 
-    if has_unpushed_commits(str(worktree_path), branch):
-        print(f"⚠️  Skipping cleanup: Unpushed commits in {worktree_path}", file=sys.stderr)
-        return False
+    removed = 0
+    for path in paths:
+        if os.path.exists(path):
+            log_stderr(f"❌ Failed to remove worktree: {path}")
+        else:
+            log_stderr(f"🗑️  Removed worktree: {path}")
+            removed += 1
+    return removed
 
-    # Archive metadata
-    archive_metadata(str(worktree_path), reason="agent-completed")
 
-    # Remove worktree
-    try:
-        subprocess.run(
-            ["git", "worktree", "remove", str(worktree_path)],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print(f"🗑️  Removed worktree: {worktree_path}", file=sys.stderr)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to remove worktree: {e.stderr}", file=sys.stderr)
-        return False
+# WORKSPACE_META.json contents parsed while scanning for worktrees,
+# keyed by workspace path; populated before any worker threads start
+_meta_cache = {}
 
 
 def find_worktrees_for_branch(branch):
     """Find all worktrees for a given branch."""
     worktrees = []
-    workspace_root = Path(os.path.expanduser("~/.claude/git-workspace"))
 
-    if not workspace_root.exists():
+    # Fast path: the branch -> workspace index maintained by the
+    # auto-create hook narrows the search to a few candidate paths. The
+    # index is a hint, not authoritative: entries go stale when an
+    # issue's workspace dir is re-created under a new branch, so each
+    # candidate's metadata must still confirm the branch before the
+    # path is trusted - removal is destructive and must never act on a
+    # worktree that now belongs to a different branch. A miss, or an
+    # entry whose candidates all fail verification, falls through to
+    # the scan rather than returning nothing.
+    index_path = WORKSPACE_ROOT / ".index.json"
+    try:
+        with open(index_path) as f:
+            index = json_loads(f.read())
+        for path in index.get(branch, ()):
+            meta_path = os.path.join(path, "WORKSPACE_META.json")
+            try:
+                with open(meta_path) as f:
+                    meta = json_loads(f.read())
+            except (FileNotFoundError, ValueError, IOError):
+                continue
+            if meta.get("branch") == branch:
+                _meta_cache[path] = meta
+                worktrees.append(path)
+        if worktrees:
+            return worktrees
+    except (FileNotFoundError, ValueError, IOError):
+        pass
+
+    # Fallback: scan workspace directories. os.scandir yields entries
+    # with type info cached from the directory read, so is_dir() costs
+    # no extra stat per candidate.
+    try:
+        entries = os.scandir(WORKSPACE_ROOT)
+    except FileNotFoundError:
         return worktrees
 
-    # Search for worktrees matching this branch
-    for workspace_dir in workspace_root.iterdir():
-        if not workspace_dir.is_dir() or workspace_dir.name.startswith("."):
-            continue
+    with entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False) or entry.name.startswith("."):
+                continue
 
-        # Check WORKSPACE_META.json for branch match
-        meta_path = workspace_dir / "WORKSPACE_META.json"
-        if meta_path.exists():
+            # Check WORKSPACE_META.json for branch match
+            meta_path = os.path.join(entry.path, "WORKSPACE_META.json")
             try:
                 with open(meta_path) as f:
-                    meta = json.load(f)
+                    meta = json_loads(f.read())
                 if meta.get("branch") == branch:
-                    worktrees.append(str(workspace_dir))
-            except (json.JSONDecodeError, IOError):
+                    _meta_cache[entry.path] = meta
+                    worktrees.append(entry.path)
+            except (FileNotFoundError, ValueError, IOError):
                 pass
 
     return worktrees
@@ -182,7 +477,7 @@ def should_cleanup_phase(phase, agent_result):
 def main():
     try:
         # Read hook input
-        input_data = json.load(sys.stdin)
+        input_data = json_loads(sys.stdin.read())
 
         # Get agent result
         agent_result = input_data.get("agent_result", {})
@@ -190,32 +485,44 @@ def main():
 
         # Get current branch
         branch = get_current_branch()
-        if not branch or branch in ["main", "master", "dev", "develop"]:
+        if not branch or branch in PROTECTED_BRANCHES:
             sys.exit(0)
 
-        # Check if branch is merged
-        if is_branch_merged(branch):
+        # Find candidate worktrees first (pure filesystem scan) so the
+        # more expensive git merge-check subprocess only runs when there
+        # is actually something to clean up
+        worktrees = find_worktrees_for_branch(branch)
+
+        if worktrees and is_branch_merged(branch):
             print(f"🎉 Branch {branch} is merged - cleaning up all worktrees", file=sys.stderr)
 
-            # Find and cleanup all worktrees for this branch
-            worktrees = find_worktrees_for_branch(branch)
-            cleaned = 0
-            skipped = 0
+            if len(worktrees) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+
+                # Worktrees are independent - run their I/O-bound checks
+                # concurrently so wall time tracks the slowest one
+                with ThreadPoolExecutor(max_workers=min(8, len(worktrees))) as executor:
+                    outcomes = list(executor.map(
+                        lambda path: check_worktree(path, branch), worktrees
+                    ))
+            else:
+                outcomes = [check_worktree(path, branch) for path in worktrees]
 
-            for worktree_path in worktrees:
-                if cleanup_worktree(worktree_path, branch):
-                    cleaned += 1
-                else:
-                    skipped += 1
+            skipped = sum(1 for ok in outcomes if not ok)
+            eligible = [
+                path for path, ok in zip(worktrees, outcomes)
+                if ok and os.path.exists(path)
+            ]
+            already_gone = sum(1 for ok in outcomes if ok) - len(eligible)
+
+            # Batched removal + prune in a single child process
+            cleaned = remove_worktrees(eligible) + already_gone
 
             if cleaned > 0:
                 print(f"✅ Cleaned up {cleaned} worktree(s)", file=sys.stderr)
                 if skipped > 0:
                     print(f"⚠️  Skipped {skipped} worktree(s) (uncommitted/unpushed work)", file=sys.stderr)
 
-                # Prune git worktree references
-                subprocess.run(["git", "worktree", "prune"], capture_output=True)
-
         # Check if specific phase should be cleaned up
         # (This would require phase detection from agent_type)
 
@@ -5,13 +5,25 @@ Triggers when agents are invoked for SDLC phases.
 
 Hook Event: PreToolUse (Task tool - agent invocation)
 """
-import json
+import functools
+import re
 import sys
 import subprocess
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
+from _worktree_lib import (
+    GH_BIN,
+    GIT_BIN,
+    PROTECTED_BRANCHES,
+    WORKSPACE_ROOT,
+    get_current_branch,
+    json_dumps,
+    json_loads,
+)
+
 # Phase to agent type mapping
 PHASE_AGENT_MAP = {
     1: {"name": "branch-init", "agents": ["Pull Request Agent", "git-workflow"]},
@@ -26,47 +38,254 @@ PHASE_AGENT_MAP = {
 }
 
 
-def get_current_branch():
-    """Get current git branch."""
-    try:
-        result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
+# Matches Linear issue IDs like ONEK-93, DES-123, etc.
+_LINEAR_RE = re.compile(r'([A-Z]+-\d+)')
 
 
+@functools.lru_cache(maxsize=32)
 def extract_linear_issue(branch_name):
     """Extract Linear issue ID from branch name."""
-    import re
-    # Match patterns like ONEK-93, DES-123, etc.
-    match = re.search(r'([A-Z]+-\d+)', branch_name)
+    match = _LINEAR_RE.search(branch_name)
     return match.group(1) if match else None
 
 
-def worktree_exists(linear_issue):
-    """Check if worktree already exists for a Linear issue."""
-    if not linear_issue:
-        return False
+# Branch -> PR index cached under the workspace root; refreshed by one
+# batched gh query at most once per TTL window
+_PR_CACHE_PATH = WORKSPACE_ROOT / ".pr-cache.json"
+_PR_CACHE_TTL = 300  # seconds
+
+
+def _pr_cache_read():
+    """Return the cached branch -> PR index if still fresh, else None."""
+    try:
+        if time.time() - os.path.getmtime(_PR_CACHE_PATH) < _PR_CACHE_TTL:
+            with open(_PR_CACHE_PATH) as f:
+                return json_loads(f.read())
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _pr_refresh_start():
+    """Kick off the batched gh query without waiting for it.
+
+    One query covering every PR keyed by head branch replaces the old
+    per-branch lookups; started via Popen so its network latency can
+    overlap the disk-heavy `git worktree add`.
+    """
+    try:
+        return subprocess.Popen(
+            [GH_BIN, "pr", "list", "--state", "all",
+             "--json", "number,url,headRefName", "--limit", "200"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
+        )
+    except OSError:
+        return None
+
+
+def _pr_refresh_collect(proc):
+    """Collect the batched gh query and persist the rebuilt index.
+
+    A short timeout keeps a slow GitHub from blocking worktree
+    creation; failures just produce an empty index (no PR recorded).
+    """
+    if proc is None:
+        return {}
+    try:
+        out, _ = proc.communicate(timeout=3)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        return {}
+    if proc.returncode != 0 or not out.strip():
+        return {}
+    try:
+        prs = json_loads(out)
+    except ValueError:
+        return {}
+
+    cache = {
+        pr["headRefName"]: {"number": pr["number"], "url": pr["url"]}
+        for pr in prs
+    }
+    try:
+        _ensure_workspace_root()
+        tmp_path = f"{_PR_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json_dumps(cache, indent=False))
+        os.replace(tmp_path, _PR_CACHE_PATH)
+    except OSError:
+        pass  # Cache is best-effort
+    return cache
+
+
+# Branch -> [workspace paths] index the cleanup hook consults so it can
+# find a branch's worktrees without opening every WORKSPACE_META.json
+_INDEX_PATH = WORKSPACE_ROOT / ".index.json"
+
+
+def _index_record(branch, worktree_path):
+    """Add a worktree to the centralized branch index.
+
+    Written atomically; stale entries are harmless because readers
+    filter on isdir, so removals never need to race this writer.
+    """
+    try:
+        with open(_INDEX_PATH) as f:
+            index = json_loads(f.read())
+        if not isinstance(index, dict):
+            index = {}
+    except (OSError, ValueError):
+        index = {}
+
+    paths = index.setdefault(branch, [])
+    if worktree_path not in paths:
+        paths.append(worktree_path)
+    # Drop entries for worktrees that no longer exist while we hold
+    # the file anyway, keeping the index from growing without bound
+    index = {
+        b: live for b, live in (
+            (b, [p for p in ps if os.path.isdir(p)]) for b, ps in index.items()
+        ) if live or b == branch
+    }
+
+    try:
+        _ensure_workspace_root()
+        tmp_path = f"{_INDEX_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json_dumps(index, indent=False))
+        os.replace(tmp_path, _INDEX_PATH)
+    except OSError:
+        pass  # Best-effort; the cleanup hook falls back to a scan
+
+
+_workspace_root_ready = False
+
+
+def _ensure_workspace_root():
+    """Create the workspace root once, then get out of the way.
+
+    mkdir(parents=True) walks and stats every ancestor on each call for
+    a directory created once per machine. A module flag short-circuits
+    repeats within the process and a .ready marker reduces later
+    processes to a single stat.
+    """
+    global _workspace_root_ready
+    if _workspace_root_ready:
+        return
+    if not (WORKSPACE_ROOT / ".ready").exists():
+        WORKSPACE_ROOT.mkdir(parents=True, exist_ok=True)
+        try:
+            (WORKSPACE_ROOT / ".ready").touch()
+        except OSError:
+            pass
+    _workspace_root_ready = True
+
 
-    workspace_dir = os.path.expanduser(f"~/.claude/git-workspace/{linear_issue.lower()}")
-    return os.path.exists(workspace_dir)
+# Ensured files outlive their session, so age them out like the other
+# workspace-root caches (.pr-cache.json has a TTL, .index.json prunes
+# itself); a day comfortably outlasts any session
+_ENSURED_TTL = 86400  # seconds
 
 
-def create_worktree(phase, branch, agent_type):
-    """Create isolated worktree for agent work."""
+def _ensured_path(session_id):
+    return WORKSPACE_ROOT / f".ensured-{session_id}.json"
+
+
+def _prune_ensured(now):
+    """Unlink ensured files (and stray temps) past their TTL.
+
+    Runs when a new ensured file is written - rare enough that one
+    scandir of the workspace root keeps it from growing one stale
+    session file at a time forever.
+    """
+    try:
+        with os.scandir(WORKSPACE_ROOT) as entries:
+            for entry in entries:
+                if not entry.name.startswith(".ensured-"):
+                    continue
+                try:
+                    if now - entry.stat().st_mtime > _ENSURED_TTL:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def _load_ensured(session_id):
+    """Issues whose worktrees were already ensured this session.
+
+    Each hook runs in a fresh process, so the ensured set is persisted
+    per session under the workspace root; reading it is one small-file
+    open versus re-running the branch/phase/existence checks.
+    """
+    try:
+        with open(_ensured_path(session_id)) as f:
+            return set(json_loads(f.read()))
+    except (OSError, ValueError):
+        return set()
+
+
+def _mark_ensured(session_id, linear_issue):
+    """Record that an issue's worktree is ensured for this session."""
+    ensured = _load_ensured(session_id)
+    ensured.add(linear_issue)
+    try:
+        _ensure_workspace_root()
+        path = _ensured_path(session_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json_dumps(sorted(ensured), indent=False))
+        os.replace(tmp_path, path)
+        _prune_ensured(time.time())
+    except OSError:
+        pass  # Best-effort; worst case the checks rerun next time
+
+
+@functools.lru_cache(maxsize=1)
+def _known_worktrees():
+    """Return the set of worktree paths git itself knows about.
+
+    One `git worktree list --porcelain` call gives an authoritative
+    answer - unlike a bare stat it also reflects worktrees git has
+    pruned - and the frozenset makes repeated membership checks free
+    within a hook run.
+    """
+    try:
+        result = subprocess.run(
+            [GIT_BIN, "worktree", "list", "--porcelain"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            check=True,
+            close_fds=False
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return frozenset()
+    return frozenset(
+        line[len("worktree "):].decode()
+        for line in result.stdout.splitlines()
+        if line.startswith(b"worktree ")
+    )
+
+
+def create_worktree(phase, branch, agent_type, worktree_path):
+    """Create isolated worktree for agent work.
+
+    The caller has already resolved worktree_path and confirmed it does
+    not exist, so the filesystem is stat'd exactly once per invocation.
+    Only `git worktree add` runs on the critical path; the PR lookup
+    and metadata write are handed to a detached --finalize child.
+    """
     phase_info = PHASE_AGENT_MAP.get(phase)
     if not phase_info:
         print(f"⚠️  Invalid phase: {phase}", file=sys.stderr)
         return False
 
-    phase_name = phase_info["name"]
-    agent_role = phase_info["agents"][0]  # Primary agent role
-
     # Extract Linear issue for directory naming
     linear_issue = extract_linear_issue(branch)
     if not linear_issue:
@@ -74,89 +293,151 @@ def create_worktree(phase, branch, agent_type):
         return False
 
     # Create workspace directory at centralized location
-    workspace_root = Path(os.path.expanduser("~/.claude/git-workspace"))
-    workspace_root.mkdir(parents=True, exist_ok=True)
-
-    worktree_path = workspace_root / linear_issue.lower()
-
-    # Check if worktree already exists
-    if worktree_path.exists():
-        print(f"ℹ️  Worktree already exists: {worktree_path}", file=sys.stderr)
-        return True
+    _ensure_workspace_root()
 
     # Create git worktree
     try:
         subprocess.run(
-            ["git", "worktree", "add", str(worktree_path), branch],
+            [GIT_BIN, "worktree", "add", str(worktree_path), branch],
             check=True,
-            capture_output=True,
-            text=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            stdin=subprocess.DEVNULL,
+            close_fds=False
         )
-        print(f"✅ Created worktree: {worktree_path}", file=sys.stderr)
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to create worktree: {e.stderr}", file=sys.stderr)
         return False
 
-    # Look up PR for this branch
-    pull_request = None
-    pr_url = None
+    # Everything past this point is bookkeeping nothing in this
+    # invocation depends on, so fire-and-forget it to a detached child
+    # and acknowledge success immediately
     try:
-        result = subprocess.run(
-            ["gh", "pr", "list", "--head", branch, "--json", "number,url", "--limit", "1"],
-            capture_output=True, text=True, check=False
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--finalize",
+             str(phase), branch, agent_type, str(worktree_path)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=False
         )
-        if result.stdout.strip():
-            prs = json.loads(result.stdout)
-            if prs:
-                pull_request = f"#{prs[0]['number']}"
-                pr_url = prs[0]['url']
-    except Exception:
-        pass
+    except OSError:
+        finalize_worktree(phase, branch, agent_type, worktree_path)
+
+    # One stderr write for the success report: fewer syscalls and no
+    # interleaving with concurrently running hooks
+    sys.stderr.write(
+        f"✅ Created worktree: {worktree_path}\n"
+        f"🔗 Linear Issue: {linear_issue}\n"
+    )
+
+    return True
+
+
+def finalize_worktree(phase, branch, agent_type, worktree_path):
+    """Post-creation bookkeeping: PR lookup and metadata write.
 
-    # Create workspace metadata
+    Normally runs in the detached --finalize child so the agent never
+    waits on GitHub or metadata I/O once the worktree itself exists.
+    """
+    phase_info = PHASE_AGENT_MAP.get(phase)
+    if not phase_info:
+        return
+    linear_issue = extract_linear_issue(branch)
+
+    # Phases 1-5 run before a PR exists by definition, so only the
+    # pr-creation phase onward queries GitHub at all; a fresh cache
+    # needs no subprocess
+    pr_cache = {}
+    if phase >= 6:
+        pr_cache = _pr_cache_read()
+        if pr_cache is None:
+            pr_cache = _pr_refresh_collect(_pr_refresh_start())
+
+    pr_entry = pr_cache.get(branch)
+    pull_request = f"#{pr_entry['number']}" if pr_entry else None
+    pr_url = pr_entry["url"] if pr_entry else None
+
+    # Create workspace metadata (one clock read serves both fields)
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
     metadata = {
         "linearIssue": linear_issue,
         "branch": branch,
         "pullRequest": pull_request,
         "prUrl": pr_url,
         "workspaceDir": str(worktree_path),
-        "agentRole": agent_role,
+        "agentRole": phase_info["agents"][0],
         "agentType": agent_type,
         "phase": phase,
-        "phaseName": phase_name,
-        "createdAt": datetime.utcnow().isoformat() + "Z",
-        "lastAccessedAt": datetime.utcnow().isoformat() + "Z",
+        "phaseName": phase_info["name"],
+        "createdAt": now,
+        "lastAccessedAt": now,
         "status": "active"
     }
 
-    metadata_path = worktree_path / "WORKSPACE_META.json"
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    # Serialize once and write the whole buffer in a single syscall
+    # instead of json.dump's many small buffered writes
+    metadata_path = Path(worktree_path) / "WORKSPACE_META.json"
+    payload = json_dumps(metadata).encode()
+    fd = os.open(str(metadata_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
 
-    print(f"📝 Created workspace metadata: {metadata_path}", file=sys.stderr)
-    print(f"🔗 Linear Issue: {linear_issue}", file=sys.stderr)
-    if pull_request:
-        print(f"🔗 Pull Request: {pull_request}", file=sys.stderr)
+    _index_record(branch, str(worktree_path))
 
-    return True
+
+# Flattened (lowercased agent name, phase) pairs so phase lookup does a
+# single scan instead of lowercasing 9 phases x 3 agents per call
+_AGENT_PHASE_ITEMS = [
+    (agent_name.lower(), phase)
+    for phase, info in PHASE_AGENT_MAP.items()
+    for agent_name in info["agents"]
+]
+
+# Exact-match table for the common case of a verbatim agent type, e.g.
+# "backend-developer"; iteration order keeps first-phase precedence
+_EXACT_AGENT_TO_PHASE = {}
+for _name, _phase in _AGENT_PHASE_ITEMS:
+    _EXACT_AGENT_TO_PHASE.setdefault(_name, _phase)
 
 
 def determine_phase_from_agent(agent_type):
     """Determine SDLC phase from agent type."""
     agent_type_lower = agent_type.lower()
 
-    for phase, info in PHASE_AGENT_MAP.items():
-        for agent_name in info["agents"]:
-            if agent_name.lower() in agent_type_lower:
-                return phase
+    # O(1) hit for verbatim agent types; substring scan only for
+    # novel or decorated names
+    phase = _EXACT_AGENT_TO_PHASE.get(agent_type_lower)
+    if phase is not None:
+        return phase
+
+    for agent_name, phase in _AGENT_PHASE_ITEMS:
+        if agent_name in agent_type_lower:
+            return phase
 
     return None
 
 
 def main():
     try:
-        # Read hook input
-        input_data = json.load(sys.stdin)
+        # Detached finalization child (see create_worktree)
+        if len(sys.argv) == 6 and sys.argv[1] == "--finalize":
+            finalize_worktree(int(sys.argv[2]), sys.argv[3], sys.argv[4], sys.argv[5])
+            sys.exit(0)
+
+        # Cheap substring filter before the full JSON parse: most tool
+        # invocations aren't Task, and they can be rejected without
+        # paying for a parse at all
+        raw = sys.stdin.buffer.read()
+        if b'"Task"' not in raw:
+            sys.exit(0)  # Not an agent invocation
+
+        # Read hook input (orjson-backed parse when available)
+        input_data = json_loads(raw)
 
         # Check if this is a Task tool invocation (agent delegation)
         tool_name = input_data.get("tool_name", "")
@@ -183,25 +464,42 @@ def main():
             sys.exit(0)
 
         # Skip if on main/master/dev
-        if branch in ["main", "master", "dev", "develop"]:
+        if branch in PROTECTED_BRANCHES:
             sys.exit(0)
 
         # Extract Linear issue for workspace naming
         linear_issue = extract_linear_issue(branch)
 
-        # Check if worktree already exists
-        if worktree_exists(linear_issue):
+        # Fast path: this session already ensured a worktree for the
+        # issue, so skip every existence check
+        session_id = str(input_data.get("session_id", "default"))
+        if linear_issue and linear_issue in _load_ensured(session_id):
+            sys.exit(0)
+
+        # Resolve the workspace path once. The directory stat catches
+        # workspaces this hook made; the git worktree list (one cached
+        # call) also catches ones git knows about but we didn't create.
+        worktree_path = WORKSPACE_ROOT / linear_issue.lower() if linear_issue else None
+        if worktree_path is not None and (
+            worktree_path.exists() or str(worktree_path) in _known_worktrees()
+        ):
             print(f"ℹ️  Using existing worktree for {linear_issue}: {branch}", file=sys.stderr)
+            # Index pre-existing worktrees too, so ones created before
+            # the index existed become visible to the cleanup hook
+            _index_record(branch, str(worktree_path))
+            _mark_ensured(session_id, linear_issue)
             sys.exit(0)
 
         # Create worktree
         print(f"🚀 Auto-creating worktree for {agent_type} (Phase {phase})", file=sys.stderr)
-        success = create_worktree(phase, branch, agent_type)
+        success = create_worktree(phase, branch, agent_type, worktree_path)
 
         if success:
+            if linear_issue:
+                _mark_ensured(session_id, linear_issue)
             phase_info = PHASE_AGENT_MAP[phase]
             issue_dir = linear_issue.lower() if linear_issue else branch
-            print(f"""
+            sys.stderr.write(f"""
 🎯 Worktree Created for Agent Isolation
 
 Linear Issue: {linear_issue or 'N/A'}
@@ -211,7 +509,7 @@ Branch: {branch}
 Path: ~/.claude/git-workspace/{issue_dir}
 
 The agent will now work in this isolated workspace.
-""", file=sys.stderr)
+""")
 
         sys.exit(0)  # Always allow the agent to proceed
 